@@ -1,331 +1,560 @@
-import logging
-from typing import List, Dict
-from urllib.parse import urljoin, urlparse
-import re
-import os
-from typing import Optional
-import requests
-from bs4 import BeautifulSoup, NavigableString
-
-logger = logging.getLogger(__name__)
-
-HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/91.0.4472.124 Safari/537.36"
-    )
-}
-
-def find_articles(url: str, soup: BeautifulSoup):
-    host = urlparse(url).netloc.lower()
-    if "legislacja.rcl.gov.pl" in host:
-        return soup.select("li .cbp_tmlabel")
-    return []
-
-def fetch_subpages(main_url: str) -> List[Dict[str, str]]:
-    """
-    Pobierz listę pozycji (tytuł + link) z osi czasu projektu na legislacja.rcl.gov.pl.
-
-    Args:
-        main_url: URL strony projektu (np. https://legislacja.rcl.gov.pl/projekt/12400101)
-        max_items: maksymalna liczba pozycji do zwrócenia
-
-    Returns:
-        Lista słowników: {"title": <tytuł>, "link": <absolutny URL>}
-    """
-    try:
-        response = requests.get(main_url, headers=HEADERS, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        articles = find_articles(main_url, soup)
-        news_list: List[Dict[str, str]] = []
-
-        for article in articles:
-            a = article if article.name == "a" and article.get("href") else article.select_one("a[href]")
-            if not a:
-                continue
-
-            href = a.get("href")
-            if not href:
-                continue
-
-            link = urljoin(main_url, href)
-            title = a.get_text(strip=True)
-            if title and link:
-                news_list.append({"title": title, "link": link})
-
-        return news_list
-
-    except requests.RequestException as e:
-        logger.error(f"Failed to fetch RCL page {main_url}: {e}")
-        return []
-
-def find_acts(url: str, soup: BeautifulSoup):
-    host = urlparse(url).netloc.lower()
-    path = urlparse(url).path.lower()
-
-    if "legislacja.rcl.gov.pl" in host:
-        return soup.select('li .cbp_tmlabel ul .clearbox ul ul li')
-
-    if "sejm.gov.pl" in host:
-        return soup.select('.druk')
-
-    if "dziennikustaw.gov.pl" in host:
-        anchors = soup.select(
-            'td p a[href$=".pdf"], a[href^="/DU/"][href$=".pdf"], a[href*="/DU/"][href$=".pdf"]'
-        )
-        fixed = []
-        for a in anchors:
-            if not a.get("href"):
-                continue
-            if not a.get_text(strip=True):
-                label = None
-
-                p = a.find_parent("p")
-                if p:
-                    b = p.find("b")
-                    if b and b.get_text(strip=True):
-                        label = b.get_text(strip=True)
-
-                if not label:
-                    img = a.find("img")
-                    if img:
-                        label = img.get("title") or img.get("alt")
-
-                if not label:
-                    label = a.get("href").rsplit("/", 1)[-1]
-
-                a.append(NavigableString(" " + label))
-
-            fixed.append(a)
-        return fixed
-    if host.endswith("gov.pl") and "/web/finanse" in path:
-        nodes = soup.select('article#main-content a.file-download[href]')
-        if nodes:
-            return nodes
-        nodes = soup.select('article#main-content a[href*="/attachment/"], article#main-content a[href$=".pdf"]')
-        if nodes:
-            return nodes
-        return soup.select('a.file-download[href], a[href*="/attachment/"], a[href$=".pdf"]')
-    return []
-
-def downloadable_acts(url):
-    """
-    Download legislative acts from the given URL
-
-    Args:
-        url: URL of the legislative acts page
-
-    Returns:
-        Dictionary of documents to download
-    """
-    try:
-        response = requests.get(url, headers=HEADERS, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        articles = find_acts(url, soup)
-        news_list: List[Dict[str, str]] = []
-
-        for article in articles:
-            a = article if article.name == "a" and article.get("href") else article.select_one("a[href]")
-            if not a:
-                continue
-
-            href = a.get("href")
-            if not href:
-                continue
-
-            link = urljoin(url, href)
-            title = a.get_text(strip=True)
-            if title and link:
-                news_list.append({"title": title, "link": link})
-
-        return news_list
-
-    except requests.RequestException as e:
-        logger.error(f"Failed to fetch RCL page {url}: {e}")
-        return []
-
-def _filename_from_cd(content_disposition: Optional[str]) -> Optional[str]:
-    if not content_disposition:
-        return None
-    m = re.search(r"filename\*\s*=\s*[^']+'[^']*'([^;]+)", content_disposition, flags=re.I)
-    if m:
-        return m.group(1)
-    m = re.search(r'filename\s*=\s*"([^"]+)"', content_disposition, flags=re.I)
-    if m:
-        return m.group(1)
-    m = re.search(r"filename\s*=\s*([^;]+)", content_disposition, flags=re.I)
-    if m:
-        return m.group(1).strip()
-    return None
-
-def _looks_like_pdf(content: bytes, headers: dict) -> bool:
-    if content[:4] == b"%PDF":
-        return True
-    start = content.lstrip()[:4]
-    if start == b"%PDF":
-        return True
-    ct = headers.get("Content-Type", "").lower()
-    return "pdf" in ct
-
-def _download_once(url: str, headers: dict, timeout: int = 60):
-    r = requests.get(url, headers=headers, timeout=timeout, stream=True, allow_redirects=True)
-    r.raise_for_status()
-    content = b""
-    for chunk in r.iter_content(chunk_size=8192):
-        if chunk:
-            content += chunk
-    return r, content
-
-def _safe_dirname(name: str) -> str:
-    """
-    Uproszczone oczyszczanie nazwy folderu (bez niedozwolonych znaków dla Windows/macOS/Linux).
-    """
-    sanitized = re.sub(r'[<>:"/\\|?*]+', "_", name).strip()
-    sanitized = sanitized.strip(" .")[:120]  
-    return sanitized or "untitled"
-
-def download_file(url: str, folder: str, title: Optional[str], subtitle: Optional[str], referer: Optional[str] = None) -> str:
-    """
-    Pobiera plik spod `url` i zapisuje go do podfolderu `title[/subtitle]` wewnątrz `folder`.
-    - Nie dubluje plików (gdy istnieje).
-    - Dla gov.pl attachment sprawdza, czy faktycznie pobrał PDF; jeśli nie, próbuje alternatywne ścieżki.
-    """
-    base_dir = folder
-    if title:
-        base_dir = os.path.join(base_dir, _safe_dirname(title))
-    if subtitle:
-        base_dir = os.path.join(base_dir, _safe_dirname(subtitle))
-    os.makedirs(base_dir, exist_ok=True)
-
-    req_headers = dict(HEADERS)
-    req_headers["Accept"] = "application/pdf,application/octet-stream;q=0.9,*/*;q=0.8"
-    if referer:
-        req_headers["Referer"] = referer
-
-    resp, content = _download_once(url, req_headers)
-    filename = _filename_from_cd(resp.headers.get("Content-Disposition")) or os.path.basename(urlparse(url).path) or "pobrany_plik"
-    dest_path = os.path.join(base_dir, filename)
-
-    if os.path.exists(dest_path):
-        return dest_path
-
-    p = urlparse(url)
-    if not _looks_like_pdf(content, resp.headers) and p.netloc.endswith("gov.pl") and "/attachment/" in p.path:
-        candidates = []
-        candidates.append(url.rstrip("/") + "/download")
-        candidates.append(url + ("&download=1" if "?" in url else "?download=1"))
-
-        for alt in candidates:
-            try:
-                resp2, content2 = _download_once(alt, req_headers)
-                if _looks_like_pdf(content2, resp2.headers):
-                    filename2 = _filename_from_cd(resp2.headers.get("Content-Disposition")) or filename
-                    dest_path = os.path.join(base_dir, filename2)
-                    if os.path.exists(dest_path):
-                        return dest_path
-                    with open(dest_path, "wb") as f:
-                        f.write(content2)
-                    return dest_path
-            except requests.RequestException:
-                pass 
-
-    with open(dest_path, "wb") as f:
-        f.write(content)
-    return dest_path
-
-
-# def download_file(url: str, folder: str, title: str, subtitle: str) -> str:
-#     """
-#     Pobiera plik spod `url` i zapisuje go do podfolderu `title` wewnątrz `folder`.
-#     - Jeśli podfolder nie istnieje, zostanie utworzony.
-#     - Jeśli plik o tej samej nazwie już istnieje, nie jest pobierany ponownie (zapobieganie duplikacji).
-
-#     Zwraca pełną ścieżkę do pliku.
-#     """
-#     base_dir = folder
-#     if title:
-#         base_dir = os.path.join(folder, _safe_dirname(title))
-#     if subtitle:
-#         base_dir = os.path.join(base_dir, _safe_dirname(subtitle))
-#     os.makedirs(base_dir, exist_ok=True)
-
-#     filename = os.path.basename(urlparse(url).path) or "pobrany_plik"
-#     dest_path = os.path.join(base_dir, filename)
-
-#     if os.path.exists(dest_path):
-#         return dest_path
-
-#     with requests.get(url, stream=True, timeout=60, headers=HEADERS) as r:
-#         r.raise_for_status()
-#         with open(dest_path, "wb") as f:
-#             for chunk in r.iter_content(chunk_size=8192):
-#                 if chunk:  
-#                     f.write(chunk)
-
-#     return dest_path
-
-def get_title_from_url(url: str) -> str:
-    """
-    Extract a readable title from the URL.
-
-    Args:
-        url: The URL to extract the title from.
-
-    Returns:
-        A cleaned-up title string.
-    """
-    try:
-        response = requests.get(url, headers=HEADERS, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        host = urlparse(url).netloc.lower()
-        if "legislacja.rcl.gov.pl" in host:
-            title = soup.select_one(".rcl-title")
-        if "sejm.gov.pl" in host:
-            title = soup.select_one(".h2")
-        if "dziennikustaw.gov.pl" in host or "gov.pl/web/finanse" in host:
-            title = soup.find("h2")
-        else:
-            title = soup.find("title")
-        return title.get_text(strip=True) if title else "untitled"
-
-    except requests.RequestException as e:
-        logger.error(f"Failed to fetch RCL page {url}: {e}")
-        return []
-
-
-def get_acts(url):
-    """
-    Fetch and extract text from legislative acts on legislacja.rcl.gov.pl
-
-    Args:
-        url: URL of the legislative act page
-
-    Returns:
-        Downloaded acts as pdf or text content
-    """
-    host = urlparse(url).netloc.lower()
-    path = urlparse(url).path.lower()
-    if "legislacja.rcl.gov.pl" in host:
-        title = get_title_from_url(url)
-        subpages = fetch_subpages(url)
-        for subpage in subpages:
-            acts = downloadable_acts(subpage['link'])
-            for act in acts:
-                print(f" - Found document: {act['title']} at {act['link']}")
-                download_file(act['link'], "legal_acts", title, subpage['title'])
-    if "sejm.gov.pl" in host or "dziennikustaw.gov.pl" in host\
-        or (host.endswith("gov.pl") and "/web/finanse" in path):
-        title = get_title_from_url(url)
-        acts = downloadable_acts(url)
-        for act in acts:
-            link = act['link']
-            print(f" - Found document: {act['title']} at {link}")
-            download_file(link, "legal_acts", title, None)
-    else:
-        logger.warning(f"Unsupported host for acts downloading: {host}")
\ No newline at end of file
+import asyncio
+import logging
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict
+from urllib.parse import urljoin, urlparse
+import re
+import os
+import sqlite3
+from typing import Optional
+import aiofiles
+import httpx
+import soupsieve as sv
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+# Selektory kompilowane raz przy imporcie — SoupSieve nie musi ich parsować
+# przy każdym wywołaniu find_articles/find_acts.
+_SELECTORS = {
+    "rcl_articles": sv.compile("li .cbp_tmlabel"),
+    "rcl_acts": sv.compile('li .cbp_tmlabel ul .clearbox ul ul li'),
+    "sejm_acts": sv.compile('.druk'),
+    "du_acts": sv.compile(
+        'td p a[href$=".pdf"], a[href^="/DU/"][href$=".pdf"], a[href*="/DU/"][href$=".pdf"]'
+    ),
+    "fin_primary": sv.compile('article#main-content a.file-download[href]'),
+    "fin_secondary": sv.compile(
+        'article#main-content a[href*="/attachment/"], article#main-content a[href$=".pdf"]'
+    ),
+    "fin_fallback": sv.compile('a.file-download[href], a[href*="/attachment/"], a[href$=".pdf"]'),
+    "any_link": sv.compile("a[href]"),
+}
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/91.0.4472.124 Safari/537.36"
+    )
+}
+
+# Limit how many requests are in flight at once so we do not trip rate limits.
+CONCURRENCY = 8
+
+# Transient statuses worth retrying with backoff instead of failing the act.
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+_RETRY_ATTEMPTS = 3
+_RETRY_BACKOFF = 0.3
+
+# get_acts parsowało ten sam URL do czterech razy na akt; cache usuwa
+# powtórne splity i lowercase'y na gorącej pętli.
+_urlparse = lru_cache(maxsize=4096)(urlparse)
+
+@lru_cache(maxsize=4096)
+def _classify(url: str) -> Optional[str]:
+    """
+    Zaklasyfikuj URL do jednego ze wspieranych serwisów:
+    "rcl", "sejm", "du", "fin" albo None dla niewspieranych hostów.
+    """
+    p = _urlparse(url)
+    host = p.netloc.lower()
+    path = p.path.lower()
+    if "legislacja.rcl.gov.pl" in host:
+        return "rcl"
+    if "sejm.gov.pl" in host:
+        return "sejm"
+    if "dziennikustaw.gov.pl" in host:
+        return "du"
+    if host.endswith("gov.pl") and "/web/finanse" in path:
+        return "fin"
+    return None
+
+def _make_session() -> httpx.AsyncClient:
+    """
+    Jedna sesja na cały przebieg: pula połączeń keep-alive zamiast nowego
+    uścisku TCP+TLS na każdy URL. HTTP/2 pozwala multipleksować wiele
+    pobrań z tego samego hosta po jednym połączeniu.
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        headers=HEADERS,
+        timeout=httpx.Timeout(60.0, read=_SOCK_READ_TIMEOUT),
+        limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+        follow_redirects=True,
+    )
+
+def find_articles(url: str, soup: BeautifulSoup):
+    if _classify(url) == "rcl":
+        return _SELECTORS["rcl_articles"].select(soup)
+    return []
+
+def _title_from_soup(url: str, soup: BeautifulSoup) -> str:
+    kind = _classify(url)
+    if kind == "rcl":
+        title = soup.select_one(".rcl-title")
+    elif kind == "sejm":
+        title = soup.select_one(".h2")
+    elif kind in ("du", "fin"):
+        title = soup.find("h2")
+    else:
+        title = soup.find("title")
+    return title.get_text(strip=True) if title else "untitled"
+
+# Tytuły już wyciągnięte w tym przebiegu — subpages tego samego projektu
+# dzielą tytuł strony głównej, więc nie ma po co pobierać jej ponownie.
+_TITLE_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_TITLE_CACHE_MAX = 256
+
+def _cache_title(url: str, title: str) -> None:
+    _TITLE_CACHE[url] = title
+    _TITLE_CACHE.move_to_end(url)
+    while len(_TITLE_CACHE) > _TITLE_CACHE_MAX:
+        _TITLE_CACHE.popitem(last=False)
+
+async def _fetch_and_parse(session: httpx.AsyncClient, url: str):
+    """
+    Jedno pobranie + jedno parsowanie strony: zwraca (soup, tytuł).
+    Przy błędzie sieci zwraca (None, "untitled").
+    """
+    try:
+        response = await session.get(url, timeout=30)
+        response.raise_for_status()
+        body = response.content
+    except httpx.HTTPError as e:
+        logger.error(f"Failed to fetch RCL page {url}: {e}")
+        return None, "untitled"
+
+    soup = BeautifulSoup(body, "lxml")
+    title = _title_from_soup(url, soup)
+    _cache_title(url, title)
+    return soup, title
+
+def _subpages_from_soup(main_url: str, soup: BeautifulSoup) -> List[Dict[str, str]]:
+    articles = find_articles(main_url, soup)
+    news_list: List[Dict[str, str]] = []
+
+    for article in articles:
+        a = article if article.name == "a" and article.get("href") else _SELECTORS["any_link"].select_one(article)
+        if not a:
+            continue
+
+        href = a.get("href")
+        if not href:
+            continue
+
+        link = urljoin(main_url, href)
+        title = a.get_text(strip=True)
+        if title and link:
+            news_list.append({"title": title, "link": link})
+
+    return news_list
+
+async def fetch_subpages(session: httpx.AsyncClient, main_url: str) -> List[Dict[str, str]]:
+    """
+    Pobierz listę pozycji (tytuł + link) z osi czasu projektu na legislacja.rcl.gov.pl.
+
+    Args:
+        session: współdzielony klient httpx
+        main_url: URL strony projektu (np. https://legislacja.rcl.gov.pl/projekt/12400101)
+
+    Returns:
+        Lista słowników: {"title": <tytuł>, "link": <absolutny URL>}
+    """
+    soup, _ = await _fetch_and_parse(session, main_url)
+    if soup is None:
+        return []
+    return _subpages_from_soup(main_url, soup)
+
+def _label_from_context(a) -> str:
+    """
+    Etykieta dla anchora bez własnego tekstu: pogrubienie w rodzicu <p>,
+    potem title/alt obrazka, na końcu nazwa pliku z href.
+    """
+    p = a.find_parent("p")
+    if p:
+        b = p.find("b")
+        if b and b.get_text(strip=True):
+            return b.get_text(strip=True)
+
+    img = a.find("img")
+    if img and (img.get("title") or img.get("alt")):
+        return img.get("title") or img.get("alt")
+
+    return a.get("href").rsplit("/", 1)[-1]
+
+def _links_from_nodes(nodes) -> List[tuple]:
+    entries: List[tuple] = []
+    for node in nodes:
+        a = node if node.name == "a" and node.get("href") else _SELECTORS["any_link"].select_one(node)
+        if not a:
+            continue
+        href = a.get("href")
+        if not href:
+            continue
+        entries.append((href, a.get_text(strip=True)))
+    return entries
+
+def _find_rcl_acts(url: str, soup: BeautifulSoup) -> List[tuple]:
+    return _links_from_nodes(_SELECTORS["rcl_acts"].select(soup))
+
+def _find_sejm_acts(url: str, soup: BeautifulSoup) -> List[tuple]:
+    return _links_from_nodes(_SELECTORS["sejm_acts"].select(soup))
+
+def _find_du_acts(url: str, soup: BeautifulSoup) -> List[tuple]:
+    entries: List[tuple] = []
+    for a in _SELECTORS["du_acts"].select(soup):
+        href = a.get("href")
+        if not href:
+            continue
+        text = a.get_text(strip=True) or _label_from_context(a)
+        entries.append((href, text))
+    return entries
+
+def _find_fin_acts(url: str, soup: BeautifulSoup) -> List[tuple]:
+    nodes = _SELECTORS["fin_primary"].select(soup)
+    if not nodes:
+        nodes = _SELECTORS["fin_secondary"].select(soup)
+    if not nodes:
+        nodes = _SELECTORS["fin_fallback"].select(soup)
+    return _links_from_nodes(nodes)
+
+# Jedna tabela zamiast łańcucha if-ów per host; nowy serwis to nowy handler
+# plus wpis tutaj i w _classify.
+_ACT_HANDLERS = {
+    "rcl": _find_rcl_acts,
+    "sejm": _find_sejm_acts,
+    "du": _find_du_acts,
+    "fin": _find_fin_acts,
+}
+
+def find_acts(url: str, soup: BeautifulSoup) -> List[tuple]:
+    """
+    Zwraca listę krotek (href, etykieta) dla dokumentów na stronie —
+    bez mutowania drzewa parsowania.
+    """
+    handler = _ACT_HANDLERS.get(_classify(url))
+    if handler is None:
+        return []
+    return handler(url, soup)
+
+def _acts_from_soup(url: str, soup: BeautifulSoup) -> List[Dict[str, str]]:
+    news_list: List[Dict[str, str]] = []
+    for href, text in find_acts(url, soup):
+        link = urljoin(url, href)
+        if text and link:
+            news_list.append({"title": text, "link": link})
+    return news_list
+
+async def downloadable_acts(session: httpx.AsyncClient, url):
+    """
+    Download legislative acts from the given URL
+
+    Args:
+        session: shared httpx client
+        url: URL of the legislative acts page
+
+    Returns:
+        Dictionary of documents to download
+    """
+    soup, _ = await _fetch_and_parse(session, url)
+    if soup is None:
+        return []
+    return _acts_from_soup(url, soup)
+
+# Wzorce kompilowane raz — _filename_from_cd i _safe_dirname chodzą raz na
+# każdy pobierany akt.
+_CD_FILENAME_STAR = re.compile(r"filename\*\s*=\s*[^']+'[^']*'([^;]+)", re.I)
+_CD_FILENAME_QUOTED = re.compile(r'filename\s*=\s*"([^"]+)"', re.I)
+_CD_FILENAME = re.compile(r"filename\s*=\s*([^;]+)", re.I)
+_UNSAFE_DIR_CHARS = re.compile(r'[<>:"/\\|?*]+')
+
+def _filename_from_cd(content_disposition: Optional[str]) -> Optional[str]:
+    if not content_disposition:
+        return None
+    m = _CD_FILENAME_STAR.search(content_disposition)
+    if m:
+        return m.group(1)
+    m = _CD_FILENAME_QUOTED.search(content_disposition)
+    if m:
+        return m.group(1)
+    m = _CD_FILENAME.search(content_disposition)
+    if m:
+        return m.group(1).strip()
+    return None
+
+def _looks_like_pdf(content: bytes, headers) -> bool:
+    # Przeskanuj nagłówek przez memoryview zamiast content.lstrip(), które
+    # alokowało kopię całego bufora tylko po to, żeby zajrzeć w pierwsze bajty.
+    mv = memoryview(content)[:64]
+    i = 0
+    while i < len(mv) and mv[i] in (0x20, 0x09, 0x0A, 0x0D):
+        i += 1
+    if bytes(mv[i:i + 4]) == b"%PDF":
+        return True
+    ct = headers.get("Content-Type", "").lower()
+    return "pdf" in ct
+
+# Ile bajtów z początku odpowiedzi trzymamy w pamięci do sniffowania %PDF.
+_SNIFF_SIZE = 1024
+
+# Maksymalna przerwa między kolejnymi chunkami — zawieszony transfer dużego
+# PDF-a przerywamy zamiast czekać do końca timeoutu całkowitego.
+_SOCK_READ_TIMEOUT = 30
+
+async def _download_once(session: httpx.AsyncClient, url: str, headers: dict, base_dir: str,
+                         fallback_name: Optional[str] = None, timeout: int = 60):
+    """
+    Pobiera `url` strumieniowo do pliku `<nazwa>.part` w `base_dir`.
+
+    Zwraca krotkę (headers, head, path, existed):
+    - headers: nagłówki odpowiedzi,
+    - head: pierwsze _SNIFF_SIZE bajtów treści (do sniffowania %PDF),
+    - path: ścieżka do pliku .part albo do istniejącego pliku docelowego,
+    - existed: True, gdy plik docelowy już był na dysku (transfer przerwany).
+    """
+    last_exc: Optional[BaseException] = None
+    for attempt in range(_RETRY_ATTEMPTS):
+        if attempt:
+            await asyncio.sleep(_RETRY_BACKOFF * 2 ** (attempt - 1))
+        try:
+            async with session.stream(
+                "GET",
+                url,
+                headers=headers,
+                timeout=httpx.Timeout(timeout, read=_SOCK_READ_TIMEOUT),
+            ) as r:
+                if r.status_code in _RETRY_STATUSES and attempt < _RETRY_ATTEMPTS - 1:
+                    logger.warning(f"Got HTTP {r.status_code} for {url}, retrying")
+                    continue
+                r.raise_for_status()
+                filename = (
+                    _filename_from_cd(r.headers.get("Content-Disposition"))
+                    or fallback_name
+                    or os.path.basename(_urlparse(url).path)
+                    or "pobrany_plik"
+                )
+                dest_path = os.path.join(base_dir, filename)
+                if os.path.exists(dest_path):
+                    return r.headers, b"", dest_path, True
+                tmp_path = dest_path + ".part"
+                # PDF-y z tych hostów idą bez Content-Encoding; czytanie przez
+                # aiter_raw omija warstwę dekodowania httpx i jej kopie per chunk.
+                raw = "Content-Encoding" not in r.headers
+                chunks = r.aiter_raw(65536) if raw else r.aiter_bytes(65536)
+                total = int(r.headers.get("Content-Length", "0"))
+                written = 0
+                head = bytearray()
+                async with aiofiles.open(tmp_path, "wb") as sink:
+                    async for chunk in chunks:
+                        if len(head) < _SNIFF_SIZE:
+                            head.extend(memoryview(chunk)[:_SNIFF_SIZE - len(head)])
+                        await sink.write(chunk)
+                        written += len(chunk)
+                # Content-Length opisuje bajty na drucie, więc porównanie ma
+                # sens tylko na ścieżce raw.
+                if raw and total and written != total:
+                    raise httpx.ReadError(
+                        f"Truncated body for {url}: {written}/{total} bytes"
+                    )
+                return r.headers, bytes(head), tmp_path, False
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code not in _RETRY_STATUSES:
+                raise
+            last_exc = e
+        except httpx.HTTPError as e:
+            last_exc = e
+    raise last_exc
+
+# Katalogi już utworzone w tym przebiegu — oszczędza parę syscalli
+# stat+mkdir na każdy plik trafiający do tego samego folderu.
+_CREATED_DIRS: set = set()
+
+def _ensure_dir(path: str) -> None:
+    if path in _CREATED_DIRS:
+        return
+    os.makedirs(path, exist_ok=True)
+    _CREATED_DIRS.add(path)
+
+# Manifest pobrań per folder docelowy: pozwala pominąć cały HTTP GET dla
+# znanych URL-i przy kolejnych uruchomieniach.
+_MANIFESTS: Dict[str, sqlite3.Connection] = {}
+
+def _manifest(folder: str) -> sqlite3.Connection:
+    conn = _MANIFESTS.get(folder)
+    if conn is None:
+        _ensure_dir(folder)
+        conn = sqlite3.connect(os.path.join(folder, "manifest.db"))
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS downloaded("
+            "url TEXT PRIMARY KEY, path TEXT, etag TEXT, last_modified TEXT)"
+        )
+        conn.commit()
+        _MANIFESTS[folder] = conn
+    return conn
+
+def _record_download(manifest: sqlite3.Connection, url: str, path: str, headers) -> None:
+    manifest.execute(
+        "INSERT OR REPLACE INTO downloaded(url, path, etag, last_modified) VALUES(?, ?, ?, ?)",
+        (url, path, headers.get("ETag"), headers.get("Last-Modified")),
+    )
+    manifest.commit()
+
+def _safe_dirname(name: str) -> str:
+    """
+    Uproszczone oczyszczanie nazwy folderu (bez niedozwolonych znaków dla Windows/macOS/Linux).
+    """
+    sanitized = _UNSAFE_DIR_CHARS.sub("_", name).strip()
+    sanitized = sanitized.strip(" .")[:120]
+    return sanitized or "untitled"
+
+async def download_file(session: httpx.AsyncClient, url: str, folder: str, title: Optional[str], subtitle: Optional[str], referer: Optional[str] = None) -> str:
+    """
+    Pobiera plik spod `url` i zapisuje go do podfolderu `title[/subtitle]` wewnątrz `folder`.
+    - Nie dubluje plików (gdy istnieje).
+    - Dla gov.pl attachment sprawdza, czy faktycznie pobrał PDF; jeśli nie, próbuje alternatywne ścieżki.
+    """
+    base_dir = folder
+    if title:
+        base_dir = os.path.join(base_dir, _safe_dirname(title))
+    if subtitle:
+        base_dir = os.path.join(base_dir, _safe_dirname(subtitle))
+    _ensure_dir(base_dir)
+
+    manifest = _manifest(folder)
+    row = manifest.execute("SELECT path, etag FROM downloaded WHERE url = ?", (url,)).fetchone()
+    if row and os.path.exists(row[0]):
+        return row[0]
+
+    req_headers = dict(HEADERS)
+    req_headers["Accept"] = "application/pdf,application/octet-stream;q=0.9,*/*;q=0.8"
+    if referer:
+        req_headers["Referer"] = referer
+
+    # Pliki ściągnięte zanim pojawił się manifest nie mają wiersza, a ich
+    # nazwa zależy od Content-Disposition. Jeśli w folderze coś już leży,
+    # tani HEAD pozwala odgadnąć nazwę i porównać ETag bez transferu ciała.
+    if row is not None or os.listdir(base_dir):
+        try:
+            probe = await session.head(url, headers=req_headers, timeout=15)
+        except httpx.HTTPError:
+            probe = None
+        if probe is not None and probe.status_code < 400:
+            guessed = (
+                _filename_from_cd(probe.headers.get("Content-Disposition"))
+                or os.path.basename(_urlparse(url).path)
+            )
+            if guessed:
+                guessed_path = os.path.join(base_dir, guessed)
+                stored_etag = row[1] if row else None
+                if os.path.exists(guessed_path) and (
+                    stored_etag is None or stored_etag == probe.headers.get("ETag")
+                ):
+                    _record_download(manifest, url, guessed_path, probe.headers)
+                    return guessed_path
+
+    resp_headers, head, tmp_path, existed = await _download_once(session, url, req_headers, base_dir)
+    if existed:
+        _record_download(manifest, url, tmp_path, resp_headers)
+        return tmp_path
+    dest_path = tmp_path[: -len(".part")]
+    filename = os.path.basename(dest_path)
+
+    p = _urlparse(url)
+    if not _looks_like_pdf(head, resp_headers) and p.netloc.endswith("gov.pl") and "/attachment/" in p.path:
+        candidates = []
+        candidates.append(url.rstrip("/") + "/download")
+        candidates.append(url + ("&download=1" if "?" in url else "?download=1"))
+
+        for alt in candidates:
+            try:
+                alt_headers, alt_head, alt_path, alt_existed = await _download_once(
+                    session, alt, req_headers, base_dir, fallback_name=filename
+                )
+                if alt_existed:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    _record_download(manifest, url, alt_path, alt_headers)
+                    return alt_path
+                if _looks_like_pdf(alt_head, alt_headers):
+                    alt_dest = alt_path[: -len(".part")]
+                    os.replace(alt_path, alt_dest)
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    _record_download(manifest, url, alt_dest, alt_headers)
+                    return alt_dest
+                if alt_path != tmp_path:
+                    os.remove(alt_path)
+            except httpx.HTTPError:
+                pass
+
+    os.replace(tmp_path, dest_path)
+    _record_download(manifest, url, dest_path, resp_headers)
+    return dest_path
+
+async def get_title_from_url(session: httpx.AsyncClient, url: str) -> str:
+    """
+    Extract a readable title from the URL.
+
+    Args:
+        session: shared httpx client
+        url: The URL to extract the title from.
+
+    Returns:
+        A cleaned-up title string.
+    """
+    cached = _TITLE_CACHE.get(url)
+    if cached is not None:
+        return cached
+    _, title = await _fetch_and_parse(session, url)
+    return title
+
+
+async def _get_acts(url):
+    kind = _classify(url)
+
+    async with _make_session() as session:
+        semaphore = asyncio.Semaphore(CONCURRENCY)
+
+        async def download(link, title, subtitle, referer=None):
+            async with semaphore:
+                try:
+                    await download_file(session, link, "legal_acts", title, subtitle, referer=referer)
+                except Exception as e:
+                    logger.error(f"Failed to download {link}: {e}")
+
+        if kind == "rcl":
+            soup, title = await _fetch_and_parse(session, url)
+            subpages = _subpages_from_soup(url, soup) if soup is not None else []
+            act_lists = await asyncio.gather(
+                *(downloadable_acts(session, subpage['link']) for subpage in subpages)
+            )
+            async with asyncio.TaskGroup() as tg:
+                for subpage, acts in zip(subpages, act_lists):
+                    for act in acts:
+                        print(f" - Found document: {act['title']} at {act['link']}")
+                        tg.create_task(download(act['link'], title, subpage['title'], referer=subpage['link']))
+        if kind in ("sejm", "du", "fin"):
+            soup, title = await _fetch_and_parse(session, url)
+            acts = _acts_from_soup(url, soup) if soup is not None else []
+            async with asyncio.TaskGroup() as tg:
+                for act in acts:
+                    link = act['link']
+                    print(f" - Found document: {act['title']} at {link}")
+                    tg.create_task(download(link, title, None))
+        else:
+            logger.warning(f"Unsupported host for acts downloading: {_urlparse(url).netloc.lower()}")
+
+
+def get_acts(url):
+    """
+    Fetch and extract text from legislative acts on legislacja.rcl.gov.pl
+
+    Args:
+        url: URL of the legislative act page
+
+    Returns:
+        Downloaded acts as pdf or text content
+    """
+    return asyncio.run(_get_acts(url))